@@ -16,12 +16,106 @@ import sys
 import math
 import time
 import hashlib
+import codecs
+import mmap
 import argparse
 import json
 from pathlib import Path
-import glob
+from collections import deque
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-def calculate_optimal_chunks(file_size, sample_size=4194304, target_coverage=0.01):
+# 4MB samples, see the module docstring
+OPTIMAL_SAMPLE_SIZE = 4194304
+# Files under 100MB always get the minimum 4 samples
+SMALL_FILE_THRESHOLD = 100 * 1024 * 1024
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+try:
+    # Several times faster than json for big multi-file outputs (pip install orjson)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libsodium's BLAKE2b picks an AVX2/SSSE3 code path at runtime.
+    # Same digests as hashlib, so FSH24-1 files stay valid either way.
+    import nacl.hashlib
+except ImportError:
+    nacl = None
+
+
+class SodiumBlake2b:
+    """
+    hashlib style wrapper around libsodium's BLAKE2b
+    PyNaCl only accepts bytes, so memoryviews (mmap samples) get copied first
+    """
+    def __init__(self, digest_size=24):
+        self.hasher = nacl.hashlib.blake2b(digest_size=digest_size)
+    
+    def update(self, data):
+        self.hasher.update(bytes(data))
+    
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+# BLAKE2b implementations we can hash with. They all give the same digests,
+# so this is purely about speed. (blake3 etc. would change every hash.)
+HASH_BACKENDS = {'hashlib': hashlib.blake2b}
+if nacl is not None:
+    HASH_BACKENDS['sodium'] = SodiumBlake2b
+
+# hashlib unless --hash-backend picks another
+hash_backend = 'hashlib'
+# Bypass the OS page cache when reading samples (--direct)
+direct_io = False
+
+
+def set_hash_backend(name):
+    """
+    Force a hash backend by name (see HASH_BACKENDS)
+    """
+    global hash_backend
+    if name not in HASH_BACKENDS:
+        raise ValueError(f"Hash backend not available: {name}" + (" (pip install pynacl)" if name == 'sodium' else ""))
+    hash_backend = name
+
+
+def get_hash_backend():
+    """
+    Name of the backend new_hasher uses
+    hashlib by default: on the CPUs we tried sodium is within noise of it, and
+    timing both on every run cost more than a small file takes to hash.
+    """
+    return hash_backend
+
+
+def init_worker(backend, direct):
+    """
+    Worker process initializer, carries the main process settings over
+    Workers get the backend we already picked instead of benchmarking again
+    """
+    global direct_io
+    set_hash_backend(backend)
+    direct_io = direct
+
+
+def new_hasher(digest_size=24):
+    """
+    Create a BLAKE2b hasher
+    Uses hashlib or the vectorized libsodium BLAKE2b (pip install pynacl),
+    whichever is faster on this machine
+    """
+    return HASH_BACKENDS[get_hash_backend()](digest_size=digest_size)
+
+
+def calculate_optimal_chunks(file_size, sample_size=OPTIMAL_SAMPLE_SIZE, target_coverage=0.01):
     """
     Calculate optimal number of middle chunks based on file size
     
@@ -32,71 +126,283 @@ def calculate_optimal_chunks(file_size, sample_size=4194304, target_coverage=0.0
     Total chunks = first + middle + last
     Returns middle chunk count only
     """
-    # Convert bytes to MB
-    file_size_mb = file_size / (1024 * 1024)
-    
     # Small files: use fixed 4 chunks (2 middle) for speed
-    if file_size_mb < 100:
-        return 2  # Changed from 1 to 2 for 4 total chunks
+    if file_size < SMALL_FILE_THRESHOLD:
+        return 2
     
-    # Medium+ files: calculate chunks needed for AT LEAST target coverage
-    # Total coverage = total_chunks * sample_size / file_size
-    # We want: total_chunks * sample_size / file_size >= target_coverage
-    # So: total_chunks >= (target_coverage * file_size) / sample_size
-    target_total_chunks = (target_coverage * file_size) / sample_size
+    # Medium+ files: total_chunks * sample_size / file_size >= target_coverage
+    # Rounded UP to ensure we meet at least the target coverage.
+    # This stays a float ceil, an integer ceil rounds some sizes differently and that would change their hashes.
+    total_chunks = math.ceil(target_coverage * file_size / sample_size)
     
-    # Round UP to ensure we meet at least the target coverage
-    target_total_chunks = math.ceil(target_total_chunks)
-    
-    # Ensure we have at least 4 total chunks (2 middle)
-    target_total_chunks = max(4, target_total_chunks)
+    # At least 4 total chunks, minus first and last = at least 2 middle chunks
+    return max(4, total_chunks) - 2
+
+
+def sample_offsets(file_size, middle_chunks):
+    """
+    Offsets of every 4MB sample, in the order they get hashed
+    First chunk + evenly distributed middle chunks + last chunk
+    """
+    # Small files: just the first chunk, middle and last chunks would overlap it
+    if file_size <= OPTIMAL_SAMPLE_SIZE * (middle_chunks + 2):
+        return [0]
     
-    # Convert total chunks to middle chunks (subtract first and last)
-    middle_chunks = target_total_chunks - 2
+    # Distribute middle chunks evenly across the file
+    total = middle_chunks + 2
+    return [0] + [file_size * i // total for i in range(2, total)] + [file_size - OPTIMAL_SAMPLE_SIZE]
+
+
+def read_samples(f, offsets):
+    """
+    Yield the 4MB samples at offsets, in order
+    Samples are read into reused buffers, so a yielded view is only valid
+    until the next sample is requested.
+    Where os.preadv exists the reads overlap, see pread_samples.
+    """
+    if not hasattr(os, 'preadv') or len(offsets) < 2:
+        # Windows (no preadv) or nothing to overlap
+        buffer = bytearray(OPTIMAL_SAMPLE_SIZE)
+        view = memoryview(buffer)
+        for offset in offsets:
+            f.seek(offset)
+            yield view[:f.readinto(buffer)]
+        return
+    
+    yield from pread_samples(f.fileno(), offsets)
+
+
+def pread_samples(fd, offsets, direct=False, max_workers=8):
+    """
+    Yield the 4MB samples at offsets, in order, read with os.preadv from a small thread pool
+    The drive gets a queue of requests to reorder instead of one seek at a time.
+    At most max_workers reads are in flight, each into its own reused buffer,
+    so a yielded view is only valid until the next sample is requested.
     
-    # Ensure middle chunks is at least 2 (for minimum 4 total chunks)
-    middle_chunks = max(2, middle_chunks)  # Changed from 1 to 2
+    direct: fd is opened O_DIRECT, reads have to start on a page boundary
+    and there is no page cache to give hints to
+    """
+    fadvise = None if direct else getattr(os, 'posix_fadvise', None)
+    if fadvise:
+        # Sparse access pattern, stop the kernel reading ahead past each sample
+        fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)
+    
+    # O_DIRECT wants the buffer address, offset and length all block aligned.
+    # Anonymous maps are page aligned, and one extra page covers samples that
+    # don't start on a page boundary (middle and last chunks usually don't).
+    align = mmap.PAGESIZE if direct else 1
+    buffer_size = OPTIMAL_SAMPLE_SIZE + (mmap.PAGESIZE if direct else 0)
+    workers = min(max_workers, len(offsets))
+    # One buffer per read in flight, a buffer only gets refilled after its sample was hashed
+    buffers = [mmap.mmap(-1, buffer_size) for _ in range(workers)]
     
-    return middle_chunks
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            next_index = 0
+            while next_index < len(offsets) or pending:
+                # Keep the read queue topped up
+                while next_index < len(offsets) and len(pending) < workers:
+                    offset = offsets[next_index]
+                    buffer = buffers[next_index % workers]
+                    next_index += 1
+                    if fadvise:
+                        fadvise(fd, offset, OPTIMAL_SAMPLE_SIZE, os.POSIX_FADV_WILLNEED)
+                    pending.append((offset, buffer, pool.submit(os.preadv, fd, [buffer], offset - offset % align)))
+                
+                offset, buffer, future = pending.popleft()
+                skip = offset % align
+                with memoryview(buffer)[skip:min(future.result(), skip + OPTIMAL_SAMPLE_SIZE)] as sample:
+                    yield sample
+    finally:
+        for buffer in buffers:
+            buffer.close()
 
 
-def fast_sample_hash(filepath, target_coverage=0.01):
+def map_samples(f, offsets, file_size, prefetch=8):
+    """
+    Yield zero-copy views of the 4MB samples at offsets, in order
+    Each sample gets its own small memory map, so the hasher reads straight out
+    of the page cache instead of copying the sample into a new bytes object.
+    Only the samples are mapped, never the whole file, which keeps huge files
+    workable in a 32bit address space.
+    Up to prefetch samples ahead are mapped and handed to the kernel with MADV_WILLNEED.
+    """
+    fd = f.fileno()
+    
+    def map_sample(offset):
+        # Map offsets have to be a multiple of the allocation granularity
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        mm = mmap.mmap(fd, min(offset + OPTIMAL_SAMPLE_SIZE, file_size) - start,
+                       offset=start, access=mmap.ACCESS_READ)
+        # Sparse access pattern, stop the kernel reading ahead past the sample
+        mm.madvise(mmap.MADV_RANDOM)
+        mm.madvise(mmap.MADV_WILLNEED)
+        return offset - start, mm
+    
+    pending = deque()
+    next_index = 0
+    while next_index < len(offsets) or pending:
+        # Keep the prefetch queue topped up
+        while next_index < len(offsets) and len(pending) <= prefetch:
+            pending.append(map_sample(offsets[next_index]))
+            next_index += 1
+        
+        skip, mm = pending.popleft()
+        # Views are released and the map closed before the next sample.
+        # The samples stay in the page cache, that's what makes a second run fast.
+        with mm, memoryview(mm) as mv, mv[skip:skip + OPTIMAL_SAMPLE_SIZE] as sample:
+            yield sample
+
+
+def direct_samples(f, offsets):
+    """
+    Yield the 4MB samples at offsets, in order, without going through the OS page cache
+    Every sample really comes off the disk, even when the file was just read or downloaded.
+    Linux uses O_DIRECT, macOS F_NOCACHE. Elsewhere, or on filesystems that refuse
+    O_DIRECT (tmpfs etc.), this is just read_samples.
+    """
+    fd = f.fileno()
+    
+    if fcntl is not None and hasattr(os, 'O_DIRECT'):
+        try:
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_DIRECT)
+        except OSError:
+            yield from read_samples(f, offsets)
+            return
+        
+        # Nothing is cached, so overlapping the reads is the only way to keep the drive busy
+        yield from pread_samples(fd, offsets, direct=True)
+        return
+    
+    if fcntl is not None and hasattr(fcntl, 'F_NOCACHE'):
+        # macOS: normal reads, the kernel just doesn't cache them
+        fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+    yield from read_samples(f, offsets)
+
+
+def fast_sample_hash(filepath, target_coverage=0.01, file_size=None):
     """
     Super fast integrity hash using strategic 4MB sampling
     Hashes: first chunk + N middle chunks + last chunk + file size
     24 bytes = 48 hex chars
     
     target_coverage: target percentage of file to sample (0.01 = 1%)
+    file_size: size in bytes if the caller already has it, saves a stat
     """
-    file_size = os.path.getsize(filepath)
-    middle_chunks = calculate_optimal_chunks(file_size, 4194304, target_coverage)
+    if file_size is None:
+        file_size = os.path.getsize(filepath)
+    middle_chunks = calculate_optimal_chunks(file_size, OPTIMAL_SAMPLE_SIZE, target_coverage)
     
-    hasher = hashlib.blake2b(digest_size=24)
+    offsets = sample_offsets(file_size, middle_chunks)
     
     with open(filepath, "rb") as f:
-        # Hash first chunk
-        first_chunk = f.read(4194304)
-        hasher.update(first_chunk)
+        if direct_io:
+            return hash_samples(direct_samples(f, offsets), file_size), middle_chunks + 2
         
-        # Hash multiple middle chunks for better coverage
-        if file_size > 4194304 * (middle_chunks + 2):
-            for i in range(middle_chunks):
-                # Distribute middle chunks evenly across the file
-                position = file_size * (i + 2) // (middle_chunks + 2)
-                f.seek(position)
-                middle_chunk = f.read(4194304)
-                hasher.update(middle_chunk)
+        # Memory map where we can steer the kernel with madvise (not on Windows)
+        # Empty files can't be mapped at all
+        if file_size > 0 and hasattr(mmap, 'MADV_WILLNEED'):
+            try:
+                return hash_samples(map_samples(f, offsets, file_size), file_size), middle_chunks + 2
+            except (OSError, ValueError):
+                # Can't be mapped after all (sysfs, some FUSE and network mounts: ENODEV),
+                # or it shrank since the stat. Start over with plain reads.
+                pass
         
-        # Hash last chunk (avoid overlap with middle chunks)
-        if file_size > 4194304 * (middle_chunks + 2):
-            f.seek(max(0, file_size - 4194304))
-            last_chunk = f.read()
-            hasher.update(last_chunk)
+        return hash_samples(read_samples(f, offsets), file_size), middle_chunks + 2
+
+
+def hash_samples(samples, file_size):
+    """
+    Hash the samples plus the file size, as upper case hex
+    Samples are hashed in file order, the reads themselves may overlap.
+    """
+    hasher = new_hasher(24)
+    
+    # One update per sample on purpose: BLAKE2b is sequential either way, and gathering
+    # the samples into one buffer for a single update costs an extra copy of every sample.
+    update = hasher.update
+    for chunk in samples:
+        update(chunk)
     
     # Include file size in hash for extra integrity
     hasher.update(file_size.to_bytes(8, 'big'))
     
-    return hasher.hexdigest().upper(), middle_chunks + 2
+    return hasher.hexdigest().upper()
+
+
+def timed_sample_hash(filepath, target_coverage=0.01, file_size=None):
+    """
+    fast_sample_hash plus how long it took
+    Timed inside the worker so parallel runs still report per file times
+    """
+    start_time = time.time()
+    hash_hex, chunks = fast_sample_hash(filepath, target_coverage, file_size)
+    return hash_hex, chunks, time.time() - start_time
+
+
+def make_executor(job_count, workers=None):
+    """
+    Pool for hashing several files at once (default: one worker per CPU)
+    Files are independent, so they are spread over worker processes.
+    A single job gets a plain worker thread instead of a whole process pool.
+    """
+    workers = min(workers or os.cpu_count() or 1, job_count)
+    if sys.platform == 'win32':
+        # ProcessPoolExecutor on Windows tops out at 61 workers
+        workers = min(workers, 61)
+    
+    if workers > 1:
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(get_hash_backend(), direct_io))
+    return ThreadPoolExecutor(max_workers=1)
+
+
+def stat_or_none(filepath):
+    """
+    os.stat the file, or None if it doesn't exist
+    One syscall instead of os.path.exists followed by os.path.getsize
+    Like os.path.exists, any path we can't stat (not a directory, no permission,
+    name too long, embedded NUL) counts as missing
+    """
+    try:
+        return os.stat(filepath)
+    except (OSError, ValueError):
+        return None
+
+
+def scan_files(folder, recursive=False):
+    """
+    Yield paths of the files in folder, optionally walking sub folders too
+    os.scandir already knows each entry's type, so unlike glob + os.path.isfile
+    there is no extra stat per path. Hidden entries are skipped, same as glob.
+    Folders and entries we can't read (no permission, System Volume Information
+    on a drive root) are skipped too, glob swallowed those errors the same way.
+    """
+    try:
+        entries = os.scandir(folder)
+    except OSError:
+        return
+    
+    with entries:
+        subfolders = []
+        try:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_file():
+                        yield entry.path
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        subfolders.append(entry.path)
+                except OSError:
+                    continue
+        except OSError:
+            pass
+    
+    # Walk sub folders after this one is closed, so deep trees don't hold a handle per level
+    for subfolder in subfolders:
+        yield from scan_files(subfolder, recursive)
 
 
 def expand_file_paths(input_paths, recursive=False):
@@ -111,23 +417,9 @@ def expand_file_paths(input_paths, recursive=False):
             # It's a file, add it directly
             expanded_files.append(input_path)
         elif os.path.isdir(input_path):
-            # It's a directory, get all files from it
-            if recursive:
-                # Use glob for recursive search
-                pattern = os.path.join(input_path, '**', '*')
-                files = glob.glob(pattern, recursive=True)
-                # Filter out directories, keep only files
-                files = [f for f in files if os.path.isfile(f)]
-            else:
-                # Use glob for non-recursive search
-                pattern = os.path.join(input_path, '*')
-                files = glob.glob(pattern)
-                # Filter out directories, keep only files
-                files = [f for f in files if os.path.isfile(f)]
-            
+            # It's a directory, get all files from it (and sub folders if recursive)
             # Sort files for consistent ordering
-            files.sort()
-            expanded_files.extend(files)
+            expanded_files.extend(sorted(scan_files(input_path, recursive)))
         else:
             # Path doesn't exist, warn but continue
             print(f"Warning: Path not found: {input_path}")
@@ -135,24 +427,28 @@ def expand_file_paths(input_paths, recursive=False):
     return expanded_files
 
 
-def process_single_file(filepath, verbose=False, json_output=False, target_coverage=0.01):
+def process_single_file(filepath, verbose=False, json_output=False, target_coverage=0.01, stat=None):
     """
     Process a single file and return results
+    With json_output nothing is printed, so it can also run in a worker process
+    stat: os.stat result if the caller already has one
     """
-    if not os.path.exists(filepath):
+    if stat is None:
+        stat = stat_or_none(filepath)
+    if stat is None:
         raise FileNotFoundError(f"File not found: {filepath}")
         
-    file_size = os.path.getsize(filepath)
+    file_size = stat.st_size
     filename = os.path.basename(filepath)
 
     if (json_output==False):
         print(f"Processing: {filename}")
     
     start_time = time.time()
-    hash_hex, chunks = fast_sample_hash(filepath, target_coverage)
+    hash_hex, chunks = fast_sample_hash(filepath, target_coverage, file_size)
     elapsed_time = time.time() - start_time
     
-    coverage_percent = (chunks * 4194304 / file_size) * 100 if file_size > 0 else 0
+    coverage_percent = (chunks * OPTIMAL_SAMPLE_SIZE / file_size) * 100 if file_size > 0 else 0
     
     result = {
         'filename': filename,
@@ -167,37 +463,66 @@ def process_single_file(filepath, verbose=False, json_output=False, target_cover
     if json_output:
         return result
     
-    # Console output
+    print_result(result, verbose)
+    
+    return result
+
+
+def print_result(result, verbose=False):
+    """
+    Console output for a process_single_file result
+    """
+    file_size = result['file_size']
     if verbose:
-        print(f"File size: {file_size:,} bytes ({result['file_size']/1024/1024:.1f} MB)" if result['file_size'] < 1024**3 else f"File size: {file_size:,} bytes ({result['file_size']/1024/1024/1024:.1f} GB)")
-        print(f"FSH24: {hash_hex}")
-        print(f"Chunks: {chunks}, Coverage: {coverage_percent:.4f}%, Time: {elapsed_time:.3f}s")
+        print(f"File size: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)" if file_size < 1024**3 else f"File size: {file_size:,} bytes ({file_size/1024/1024/1024:.1f} GB)")
+        print(f"FSH24: {result['fsh24']}")
+        print(f"Chunks: {result['chunks']}, Coverage: {result['coverage_percent']:.4f}%, Time: {result['processing_time']:.3f}s")
     else:
-        print(f"FSH24: {hash_hex}")
+        print(f"FSH24: {result['fsh24']}")
+
+
+def hash_files(filepaths, target_coverage=0.01, workers=None):
+    """
+    Hash multiple files in parallel
+    Yields process_single_file results in the same order as filepaths.
+    Missing files are skipped with a warning.
+    """
+    existing_files = []
+    stats = []
+    for filepath in filepaths:
+        stat = stat_or_none(filepath)
+        if stat is None:
+            print(f"Warning: Skipping missing file: {filepath}")
+            continue
+        existing_files.append(filepath)
+        stats.append(stat)
     
-    return result
+    with make_executor(len(existing_files), workers) as pool:
+        yield from pool.map(process_single_file, existing_files, repeat(False), repeat(True), repeat(target_coverage), stats)
 
 
-def generate_hash_file_multiple(filepaths, output_filename, target_coverage=0.01):
+def write_hash_file(results, output_filename):
     """
-    Generate a hash file in FSH24 format for multiple files
+    Write process_single_file results to a hash file in FSH24 format
     """
-    with open(output_filename, "w") as f:
+    # 1MB write buffer, lines are short but there can be a lot of them
+    with open(output_filename, "w", buffering=1 << 20) as f:
         f.write("FSH24-1\n")
-        
-        for filepath in filepaths:
-            if not os.path.exists(filepath):
-                print(f"Warning: Skipping missing file: {filepath}")
-                continue
-                
-            file_size = os.path.getsize(filepath)
-            hash_hex, chunks = fast_sample_hash(filepath, target_coverage)
-            f.write(f"{hash_hex}|{chunks}|{file_size}|{filepath}\n")
+        f.writelines(f"{result['fsh24']}|{result['chunks']}|{result['file_size']}|{result['filepath']}\n"
+                     for result in results)
 
 
-def verify_hash_file(hash_filename, verbose=False, json_output=False):
+def generate_hash_file_multiple(filepaths, output_filename, target_coverage=0.01, workers=None):
+    """
+    Generate a hash file in FSH24 format for multiple files
+    """
+    write_hash_file(hash_files(filepaths, target_coverage, workers), output_filename)
+
+
+def verify_hash_file(hash_filename, verbose=False, json_output=False, workers=None):
     """
     Verify files against a hash file
+    Files with the expected size are hashed in parallel, results are reported in file order
     """
     if not os.path.exists(hash_filename):
         raise FileNotFoundError(f"Hash file not found: {hash_filename}")
@@ -218,81 +543,96 @@ def verify_hash_file(hash_filename, verbose=False, json_output=False):
     # Start timing
     start_time = time.time()
     
+    # Parse every line up front, then hand the files out to the workers
+    entries = []
+    add_entry = entries.append
     for line in lines[1:]:  # Skip header
         line = line.strip()
         if not line:
             continue
-            
-        parts = line.split("|")
+        
+        # Stop after the third |, anything past that is part of the file path
+        parts = line.split("|", 3)
         if len(parts) != 4:
             if not json_output:
                 print(f"Invalid line format: {line}")
             continue
             
         expected_hash, chunks, file_size, filepath = parts
-        chunks = int(chunks)
-        file_size = int(file_size)
-        
-        result = {
-            'filepath': filepath,
-            'filename': os.path.basename(filepath),
-            'expected_hash': expected_hash,
-            'expected_size': file_size,
-            'status': 'unknown'
-        }
+        stat = stat_or_none(filepath)
+        add_entry((expected_hash, int(chunks), int(file_size), filepath, stat.st_size if stat else None))
+    
+    with make_executor(len(entries), workers) as pool:
+        # Queue up every file that can be hashed, missing or resized files fail without hashing.
+        # The size is already known from the stat above, so the worker doesn't stat again.
+        jobs = [pool.submit(timed_sample_hash, filepath, 0.01, current_size) if current_size == file_size else None
+                for _, _, file_size, filepath, current_size in entries]
         
-        if not os.path.exists(filepath):
-            result['status'] = 'missing'
-            if not json_output:
-                print(f"!MISSING: {filepath}")
-            failed += 1
-        else:
-            current_size = os.path.getsize(filepath)
-            result['actual_size'] = current_size
-            
-            # Add to total size regardless of verification outcome
-            totalSize += current_size
-            
-            if current_size != file_size:
-                result['status'] = 'size_mismatch'
-                if not json_output:
-                    print(f"!SIZE MISMATCH: {filepath} (expected: {file_size}, actual: {current_size})")
-                failed += 1
-            else:
-                # Show "Checking..." message in verbose mode
-                if verbose and not json_output:
-                    print(f"{expected_hash}|{chunks}|{file_size}|{filepath}| Checking...", end="", flush=True)
-                
-                # Time individual file hashing
-                file_start_time = time.time()
-                current_hash, _ = fast_sample_hash(filepath)
-                file_time = time.time() - file_start_time
-                
-                # Calculate hashed size for this file (chunks * 4MB)
-                hashed_size = chunks * 4194304  # 4MB per chunk
-                totalHashedSize += hashed_size
-                
-                result['actual_hash'] = current_hash
-                result['processing_time'] = file_time
-                result['hashed_size'] = hashed_size
+        # On Ctrl+C (or any error) drop the files still queued, shutting the pool down
+        # normally would hash every one of them before the run could stop
+        try:
+            for (expected_hash, chunks, file_size, filepath, current_size), job in zip(entries, jobs):
+                result = {
+                    'filepath': filepath,
+                    'filename': os.path.basename(filepath),
+                    'expected_hash': expected_hash,
+                    'expected_size': file_size,
+                    'status': 'unknown'
+                }
                 
-                if current_hash != expected_hash:
-                    result['status'] = 'hash_mismatch'
+                if current_size is None:
+                    result['status'] = 'missing'
                     if not json_output:
-                        if verbose:
-                            # Overwrite the "Checking..." line
-                            print(f"\r{expected_hash}|{chunks}|{file_size}|{filepath}| HASH MISMATCH ✗")
-                        else:
-                            print(f"HASH MISMATCH: {filepath}")
+                        print(f"!MISSING: {filepath}")
                     failed += 1
                 else:
-                    result['status'] = 'verified'
-                    if verbose and not json_output:
-                        # Overwrite the "Checking..." line
-                        print(f"\r{expected_hash}|{chunks}|{file_size}|{filepath}| Verified ✓ ")
-                    verified += 1
-        
-        results.append(result)
+                    result['actual_size'] = current_size
+                    
+                    # Add to total size regardless of verification outcome
+                    totalSize += current_size
+                    
+                    if current_size != file_size:
+                        result['status'] = 'size_mismatch'
+                        if not json_output:
+                            print(f"!SIZE MISMATCH: {filepath} (expected: {file_size}, actual: {current_size})")
+                        failed += 1
+                    else:
+                        # Show "Checking..." message in verbose mode, but only if we actually have to wait.
+                        # Results the workers already finished go straight out without a forced flush.
+                        if verbose and not json_output and not job.done():
+                            print(f"{expected_hash}|{chunks}|{file_size}|{filepath}| Checking...", end="", flush=True)
+                        
+                        current_hash, _, file_time = job.result()
+                        
+                        # Calculate hashed size for this file (chunks * 4MB)
+                        hashed_size = chunks * OPTIMAL_SAMPLE_SIZE  # 4MB per chunk
+                        totalHashedSize += hashed_size
+                        
+                        result['actual_hash'] = current_hash
+                        result['processing_time'] = file_time
+                        result['hashed_size'] = hashed_size
+                        
+                        # Hashes are written in upper case, but accept lower case hex from other tools
+                        if current_hash != expected_hash.upper():
+                            result['status'] = 'hash_mismatch'
+                            if not json_output:
+                                if verbose:
+                                    # Overwrite the "Checking..." line
+                                    print(f"\r{expected_hash}|{chunks}|{file_size}|{filepath}| HASH MISMATCH ✗")
+                                else:
+                                    print(f"HASH MISMATCH: {filepath}")
+                            failed += 1
+                        else:
+                            result['status'] = 'verified'
+                            if verbose and not json_output:
+                                # Overwrite the "Checking..." line
+                                print(f"\r{expected_hash}|{chunks}|{file_size}|{filepath}| Verified ✓ ")
+                            verified += 1
+                
+                results.append(result)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
     
     # Calculate total time and percentage
     total_time = time.time() - start_time
@@ -330,7 +670,43 @@ def verify_hash_file(hash_filename, verbose=False, json_output=False):
     return summary
 
 
+def json_bytes(data):
+    """
+    Indented JSON as UTF-8 bytes, encoded with orjson when it's installed
+    orjson refuses strings that aren't valid UTF-8, like the lone surrogates Linux
+    file names that aren't UTF-8 decode to, so those go through json and get \\u escapes.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, indent=2).encode()
+
+
+def print_json(data):
+    """
+    Print indented JSON to stdout
+    orjson writes non-ASCII as raw UTF-8, which only goes out as is when stdout is UTF-8.
+    Any other stdout (a redirected cp1252 console on Windows) gets json's \\u escapes.
+    """
+    try:
+        utf8 = codecs.lookup(sys.stdout.encoding or '').name == 'utf-8'
+    except LookupError:
+        utf8 = False
+    
+    if utf8 and hasattr(sys.stdout, 'buffer'):
+        # Keep anything already printed ahead of the JSON
+        sys.stdout.flush()
+        sys.stdout.buffer.write(json_bytes(data) + b'\n')
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(data, indent=2))
+
+
 def main():
+    global direct_io
+    
     parser = argparse.ArgumentParser(
         description="FSH24 - Fast Sample Hash 24-byte integrity checker\nAims to make checking the integrity of 40gb game files after you download them easy.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -345,6 +721,9 @@ Examples:
   fsh24.py file.ext -j                           # JSON output
   fsh24.py checksums.fsh24                       # Verify hash file
   fsh24.py checksums.fsh24 -v                    # Verbose verify
+  fsh24.py folder/ -w 1                          # One file at a time (spinning HDDs)
+  fsh24.py file.ext --hash-backend sodium        # Use libsodium Blake2b (pynacl)
+  fsh24.py checksums.fsh24 --direct              # Verify from disk, not the OS file cache
         """
     )
     
@@ -353,18 +732,26 @@ Examples:
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
     parser.add_argument('-j', '--json', action='store_true', help='JSON output')
     parser.add_argument('-r', '--recursive', action='store_true', help='Recursively process folders')
+    parser.add_argument('-w', '--workers', type=int, help='Number of files to hash at once (default: CPU count)')
+    parser.add_argument('--hash-backend', choices=['hashlib', 'sodium'], default='hashlib',
+                        help='Blake2b implementation to use (default: hashlib, sodium needs pynacl)')
+    parser.add_argument('--direct', action='store_true',
+                        help='Read samples straight from disk, bypassing the OS file cache (Linux, macOS)')
     
     args = parser.parse_args()
     
     try:
+        set_hash_backend(args.hash_backend)
+        direct_io = args.direct
+        
         # Check if we have a single .fsh24 file (verify mode)
         if len(args.files) == 1 and args.files[0].lower().endswith('.fsh24'):
             # Verify mode
             if args.json:
-                result = verify_hash_file(args.files[0], args.verbose, json_output=True)
-                print(json.dumps(result, indent=2))
+                result = verify_hash_file(args.files[0], args.verbose, json_output=True, workers=args.workers)
+                print_json(result)
             else:
-                verify_hash_file(args.files[0], args.verbose)
+                verify_hash_file(args.files[0], args.verbose, workers=args.workers)
                 input("\nPress Enter to exit...")
         else:
             # Hash mode (files and/or folders)
@@ -377,16 +764,9 @@ Examples:
             
             if args.json:
                 # Process all files and collect results
-                results = []
                 total_start = time.time()
                 
-                for filepath in expanded_files:
-                    if not os.path.exists(filepath):
-                        print(f"Warning: Skipping missing file: {filepath}")
-                        continue
-                    
-                    result = process_single_file(filepath, args.verbose, json_output=True, target_coverage=0.01)
-                    results.append(result)
+                results = list(hash_files(expanded_files, 0.01, args.workers))
                 
                 total_time = time.time() - total_start
                 
@@ -400,23 +780,27 @@ Examples:
                 
                 if args.output:
                     # Save JSON to file
-                    with open(args.output, 'w') as f:
-                        json.dump(output_data, f, indent=2)
+                    # One encode and one big write, json.dump writes every token separately
+                    with open(args.output, 'wb') as f:
+                        f.write(json_bytes(output_data))
                     print(f"JSON saved to: {args.output}")
                 else:
-                    print(json.dumps(output_data, indent=2))
+                    print_json(output_data)
             else:
                 # Process files with console output
                 processed_files = []
+                total_file_size = 0
+                total_hashed_size = 0
                 total_start = time.time()
                 
-                for filepath in expanded_files:
-                    if not os.path.exists(filepath):
-                        print(f"Warning: Skipping missing file: {filepath}")
-                        continue
+                for result in hash_files(expanded_files, 0.01, args.workers):
+                    print(f"Processing: {result['filename']}")
+                    print_result(result, args.verbose)
+                    processed_files.append(result)
                     
-                    process_single_file(filepath, args.verbose, target_coverage=0.01)
-                    processed_files.append(filepath)
+                    # Running totals for the summary
+                    total_file_size += result['file_size']
+                    total_hashed_size += result['chunks'] * OPTIMAL_SAMPLE_SIZE  # 4MB per chunk
                     
                     if len(expanded_files) > 1:  # Add separator for multiple files
                         print()
@@ -424,24 +808,11 @@ Examples:
                 total_time = time.time() - total_start
                 
                 if processed_files:
-                    # Generate hash file
+                    # Write the hash file from the results we already have, no second hashing pass
                     output_file = args.output if args.output else "checksums.fsh24"
-                    generate_hash_file_multiple(processed_files, output_file, 0.01)
+                    write_hash_file(processed_files, output_file)
                     
                     if len(processed_files) > 1:
-                        # Calculate totals for enhanced summary
-                        total_file_size = 0
-                        total_hashed_size = 0
-                        
-                        for filepath in processed_files:
-                            file_size = os.path.getsize(filepath)
-                            middle_chunks = calculate_optimal_chunks(file_size, 4194304, 0.01)
-                            chunks = middle_chunks + 2
-                            hashed_size = chunks * 4194304  # 4MB per chunk
-                            
-                            total_file_size += file_size
-                            total_hashed_size += hashed_size
-                        
                         # Calculate percentages
                         total_hash_percentage = (total_hashed_size / total_file_size * 100) if total_file_size > 0 else 0
                         
@@ -16,52 +16,367 @@ Usage: python corrupt.py <input_file>
 
 import os
 import sys
-import random
+import mmap
+import errno
 import argparse
+import contextlib
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+import numpy as np
 from tqdm import tqdm
 
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+
+# Big chunks mean few read/write calls, small ones spend all their time in syscalls
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# Only redraw progress bars every 16MB
+PROGRESS_UPDATE_BYTES = 16 * 1024 * 1024
+# Hand corrupted chunks to writev 16MB at a time
+WRITE_BATCH_BYTES = 16 * 1024 * 1024
+# Most buffers writev takes in one call (IOV_MAX on Linux and macOS)
+IOV_MAX = 1024
+# How far ahead of the corruption to ask the kernel to read the input
+PREFETCH_BYTES = 64 * 1024 * 1024
+# Chunks read and corrupted ahead of the writer (4 x 4MB by default)
+PIPELINE_DEPTH = 4
+# Drop written output from the page cache every 64MB
+DROP_CACHE_BYTES = 64 * 1024 * 1024
+# What copy_file_range/sendfile fail with when they can't copy between two files
+KERNEL_COPY_ERRORS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP}
+
 
 def get_file_size(file_path):
     """Get file size in bytes."""
     return os.path.getsize(file_path)
 
 
-def stream_corrupt_file(input_file, output_file, corruption_percentage, file_size, 
-                       progress_bar=None, chunk_size=8192):
+def write_all(outfile, data):
+    """
+    Write all of data to an unbuffered file.
+    
+    Raw writes can be partial, so keep going until everything is written.
+    """
+    view = memoryview(data)
+    while view:
+        view = view[outfile.write(view):]
+
+
+def writev_all(outfile, buffers):
+    """
+    Write a list of buffers to an unbuffered file in as few syscalls as possible.
+    
+    writev hands them all to the kernel at once, but can stop part way like
+    a plain write, so drop whatever went out and go again.
+    Without writev (Windows) they are written one at a time.
+    """
+    if not hasattr(os, 'writev'):
+        for data in buffers:
+            write_all(outfile, data)
+        return
+    
+    fd = outfile.fileno()
+    views = [memoryview(data) for data in buffers]
+    while views:
+        written = os.writev(fd, views)
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if written:
+            views[0] = views[0][written:]
+
+
+def open_direct(outfile):
+    """
+    Stop an output file going through the OS page cache.
+    
+    Linux uses O_DIRECT, which only takes page aligned writes, so returns True
+    when the data has to go through a DirectWriter. macOS F_NOCACHE takes
+    normal writes. Elsewhere, or on filesystems that refuse O_DIRECT (tmpfs etc.),
+    this does nothing and returns False.
+    """
+    if fcntl is None:
+        return False
+    
+    fd = outfile.fileno()
+    if hasattr(os, 'O_DIRECT'):
+        try:
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_DIRECT)
+        except OSError:
+            return False
+        return True
+    
+    if hasattr(fcntl, 'F_NOCACHE'):
+        fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+    return False
+
+
+class DirectWriter:
+    """
+    Writes to an O_DIRECT file through a page aligned buffer.
+    
+    O_DIRECT wants the memory, file offset and length of every write page aligned.
+    Data is gathered in an anonymous map (always page aligned) and only whole
+    pages go out, the partial page left over moves to the front for next time.
+    close() pads the last page and cuts the file back to size.
+    """
+    
+    def __init__(self, outfile, buffer_size=WRITE_BATCH_BYTES):
+        self.outfile = outfile
+        self.buffer = mmap.mmap(-1, buffer_size - buffer_size % mmap.PAGESIZE + mmap.PAGESIZE)
+        self.view = memoryview(self.buffer)
+        self.used = 0
+        self.written = 0
+    
+    def write(self, data):
+        data = memoryview(data)
+        while data:
+            take = min(len(data), len(self.buffer) - self.used)
+            self.view[self.used:self.used + take] = data[:take]
+            self.used += take
+            data = data[take:]
+            if self.used == len(self.buffer):
+                self.flush()
+    
+    def flush(self, final=False):
+        """Write out the whole pages in the buffer, or everything padded to a page when final"""
+        length = self.used - self.used % mmap.PAGESIZE
+        if final and length < self.used:
+            length += mmap.PAGESIZE
+            self.view[self.used:length] = bytes(length - self.used)
+        if not length:
+            return
+        
+        try:
+            write_all(self.outfile, self.view[:length])
+        except OSError as e:
+            if e.errno != errno.EINVAL or self.written:
+                raise
+            # The filesystem took the flag but not the writes, go through the cache after all
+            fd = self.outfile.fileno()
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_DIRECT)
+            write_all(self.outfile, self.view[:length])
+        
+        self.written += min(length, self.used)
+        leftover = max(self.used - length, 0)
+        self.view[:leftover] = self.view[length:self.used]
+        self.used = leftover
+    
+    def close(self):
+        """Write whatever is left and trim the padding off the end of the file"""
+        size = self.written + self.used
+        self.flush(final=True)
+        self.outfile.truncate(size)
+        self.view.release()
+        self.buffer.close()
+
+
+def sequential_hint(*files):
+    """Tell the kernel we read/write these files front to back so it can read ahead further."""
+    if hasattr(os, 'posix_fadvise'):
+        for f in files:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def preallocate(outfile, size):
+    """
+    Reserve all the blocks for an output file up front.
+    
+    One allocation instead of growing the file every write, which keeps it
+    in few extents. Filesystems that can't do it just skip it.
+    """
+    if hasattr(os, 'posix_fallocate') and size > 0:
+        try:
+            os.posix_fallocate(outfile.fileno(), 0, size)
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL):
+                raise
+
+
+def drop_cache(outfile, offset, length):
+    """
+    Drop a range of an output file from the page cache.
+    
+    We never read the samples back, so there is no point letting them push
+    everything else out of memory. Only pages already written back get dropped.
+    """
+    if hasattr(os, 'posix_fadvise') and length > 0:
+        os.posix_fadvise(outfile.fileno(), offset, length, os.POSIX_FADV_DONTNEED)
+
+
+def map_input(infile):
+    """
+    Memory map an input file read only.
+    
+    Every corruption sample reads the whole input again, mapping it once lets
+    them all share the same page cache pages instead of copying through read().
+    """
+    if os.fstat(infile.fileno()).st_size == 0:
+        # Can't map an empty file
+        return contextlib.nullcontext(b'')
+    
+    input_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        input_map.madvise(mmap.MADV_SEQUENTIAL)
+    return input_map
+
+
+def corrupted_chunks(input_map, file_size, corruption_percentage, rng, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the corrupted chunks of a mapped input, in order.
+    
+    Reading and corrupting run a few chunks ahead on their own threads so the
+    disk, the CPU and the writer all work at once (the copies, madvise, NumPy
+    and write calls all let go of the GIL). One thread per stage keeps the
+    chunks, and the draws from rng, in file order so samples stay reproducible.
+    """
+    prefetch = hasattr(mmap, 'MADV_WILLNEED') and isinstance(input_map, mmap.mmap)
+    prefetched_until = 0
+    
+    def read_chunk(offset):
+        nonlocal prefetched_until
+        end = min(offset + chunk_size, file_size)
+        
+        # Keep the next PREFETCH_BYTES of input in flight while we work on this chunk,
+        # topping the window up once half of it is used so the disk always has a queue of reads
+        # madvise wants a page aligned start, so round down and stretch the length to match
+        if prefetch and prefetched_until < file_size and end + PREFETCH_BYTES // 2 >= prefetched_until:
+            prefetch_start = prefetched_until - prefetched_until % mmap.PAGESIZE
+            prefetched_until = min(end + max(PREFETCH_BYTES, chunk_size), file_size)
+            input_map.madvise(mmap.MADV_WILLNEED, prefetch_start, prefetched_until - prefetch_start)
+        
+        # Straight from the map into the array corrupt_chunk works on, one copy
+        chunk = np.empty(end - offset, dtype=np.uint8)
+        chunk[:] = np.frombuffer(input_map, dtype=np.uint8, count=end - offset, offset=offset)
+        return chunk
+    
+    def corrupt_read(read_future):
+        chunk = read_future.result()
+        # Corrupt the chunk if needed
+        if corruption_percentage > 0:
+            chunk = corrupt_chunk(chunk, corruption_percentage, rng)
+        return chunk
+    
+    def random_chunk(offset):
+        return rng.bytes(min(chunk_size, file_size - offset))
+    
+    offsets = range(0, file_size, chunk_size)
+    with ThreadPoolExecutor(max_workers=1) as reader, ThreadPoolExecutor(max_workers=1) as corrupter:
+        pending = deque()
+        next_index = 0
+        while next_index < len(offsets) or pending:
+            # Keep the pipeline topped up
+            while next_index < len(offsets) and len(pending) < PIPELINE_DEPTH:
+                if corruption_percentage >= 100:
+                    # Nothing of the input survives, so don't read it at all
+                    pending.append(corrupter.submit(random_chunk, offsets[next_index]))
+                else:
+                    read_future = reader.submit(read_chunk, offsets[next_index])
+                    pending.append(corrupter.submit(corrupt_read, read_future))
+                next_index += 1
+            
+            yield pending.popleft().result()
+
+
+def stream_corrupt_file(input_map, output_file, corruption_percentage, rng,
+                       progress_bar=None, chunk_size=DEFAULT_CHUNK_SIZE, direct=False):
     """
     Stream and corrupt a file chunk by chunk.
     
     Args:
-        input_file: input file path
+        input_map: memory map of the input file (see map_input)
         output_file: output file path
         corruption_percentage: percentage of data to corrupt (0-100)
-        file_size: total file size for progress calculation
+        rng: numpy Generator for the corruption (see sample_rng)
         progress_bar: tqdm progress bar object
         chunk_size: size of chunks to read at once
+        direct: write around the OS page cache (see open_direct)
     """
+    file_size = len(input_map)
+    bytes_written = 0
+    bytes_dropped = 0
     bytes_processed = 0
+    pending = []
+    pending_bytes = 0
     
-    with open(input_file, 'rb') as infile, open(output_file, 'wb') as outfile:
-        while True:
-            chunk = infile.read(chunk_size)
-            if not chunk:
-                break
+    # Unbuffered, our chunks are already big so the 8KB buffer layer only adds copies
+    with open(output_file, 'wb', buffering=0) as outfile:
+        sequential_hint(outfile)
+        preallocate(outfile, file_size)
+        direct_writer = DirectWriter(outfile) if direct and open_direct(outfile) else None
+        
+        for chunk in corrupted_chunks(input_map, file_size, corruption_percentage, rng, chunk_size):
+            bytes_processed += len(chunk)
+            pending.append(chunk)
+            pending_bytes += len(chunk)
             
-            # Corrupt the chunk if needed
-            if corruption_percentage > 0:
-                chunk = corrupt_chunk(chunk, corruption_percentage)
+            # Collect chunks and write them out together
+            if pending_bytes < WRITE_BATCH_BYTES and len(pending) < IOV_MAX and bytes_processed < file_size:
+                continue
             
-            outfile.write(chunk)
-            bytes_processed += len(chunk)
+            if direct_writer:
+                for data in pending:
+                    direct_writer.write(data)
+            else:
+                writev_all(outfile, pending)
+            bytes_written += pending_bytes
             
-            # Update progress bar
+            # Batches are at least as big as a progress step, so update every write
             if progress_bar:
-                progress_bar.update(len(chunk))
+                progress_bar.update(pending_bytes)
+            pending.clear()
+            pending_bytes = 0
+            
+            if bytes_written - bytes_dropped >= DROP_CACHE_BYTES:
+                drop_cache(outfile, bytes_dropped, bytes_written - bytes_dropped)
+                bytes_dropped = bytes_written
+        
+        if direct_writer:
+            direct_writer.close()
 
 
-def stream_truncate_file(input_file, output_file, percentage_to_keep, file_size,
-                        progress_bar=None, chunk_size=8192):
+def kernel_copiers(infile, outfile):
+    """
+    Ways to copy between two files without the data passing through Python, best first.
+    
+    copy_file_range can share blocks on CoW filesystems, sendfile at least keeps
+    the copy in the kernel. macOS sendfile only writes to sockets so it is skipped there.
+    Both copy from the current position of infile to the current position of outfile.
+    """
+    in_fd, out_fd = infile.fileno(), outfile.fileno()
+    copiers = []
+    if hasattr(os, 'copy_file_range'):
+        copiers.append(lambda count: os.copy_file_range(in_fd, out_fd, count))
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        copiers.append(lambda count: os.sendfile(out_fd, in_fd, None, count))
+    return copiers
+
+
+def kernel_copy(copiers, count):
+    """
+    Copy up to count bytes with the first copier that works.
+    
+    Copiers the kernel refuses for these files are dropped from the list.
+    Returns the number of bytes copied, or None once there are none left.
+    """
+    while copiers:
+        try:
+            return copiers[0](count)
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_ERRORS:
+                raise
+            copiers.pop(0)
+    return None
+
+
+def stream_truncate_file(input_file, output_file, percentage_to_keep,
+                        progress_bar=None, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Stream and truncate a file to simulate incomplete download.
     
@@ -69,62 +384,213 @@ def stream_truncate_file(input_file, output_file, percentage_to_keep, file_size,
         input_file: input file path
         output_file: output file path
         percentage_to_keep: percentage of data to keep (0-100)
-        file_size: total file size
         progress_bar: tqdm progress bar object
         chunk_size: size of chunks to read at once
+    
+    Returns:
+        int: bytes written
     """
-    bytes_to_keep = int(file_size * percentage_to_keep / 100)
     bytes_processed = 0
+    bytes_dropped = 0
+    pending_progress = 0
     
-    with open(input_file, 'rb') as infile, open(output_file, 'wb') as outfile:
+    # Unbuffered, our chunks are already big so the 8KB buffer layer only adds copies
+    with open(input_file, 'rb', buffering=0) as infile, open(output_file, 'wb', buffering=0) as outfile:
+        bytes_to_keep = int(os.fstat(infile.fileno()).st_size * percentage_to_keep / 100)
+        sequential_hint(infile, outfile)
+        preallocate(outfile, bytes_to_keep)
+        copiers = kernel_copiers(infile, outfile)
+        
         while bytes_processed < bytes_to_keep:
             # Calculate how much to read this iteration
             remaining_bytes = bytes_to_keep - bytes_processed
             read_size = min(chunk_size, remaining_bytes)
             
-            chunk = infile.read(read_size)
-            if not chunk:
+            # Let the kernel copy it if it can, otherwise read and write it ourselves
+            copied = kernel_copy(copiers, read_size)
+            if copied is None:
+                chunk = infile.read(read_size)
+                write_all(outfile, chunk)
+                copied = len(chunk)
+            if not copied:
                 break
             
-            outfile.write(chunk)
-            bytes_processed += len(chunk)
+            bytes_processed += copied
+            pending_progress += copied
             
             # Update progress bar
-            if progress_bar:
-                progress_bar.update(len(chunk))
+            if progress_bar and pending_progress >= PROGRESS_UPDATE_BYTES:
+                progress_bar.update(pending_progress)
+                pending_progress = 0
+            
+            if bytes_processed - bytes_dropped >= DROP_CACHE_BYTES:
+                drop_cache(outfile, bytes_dropped, bytes_processed - bytes_dropped)
+                bytes_dropped = bytes_processed
+        
+        # The input ran out early, don't leave the preallocated tail behind
+        if bytes_processed < bytes_to_keep:
+            outfile.truncate(bytes_processed)
+    
+    if progress_bar and pending_progress:
+        progress_bar.update(pending_progress)
+    
+    return bytes_processed
 
 
-def corrupt_chunk(chunk, corruption_percentage):
+def sample_rng(corruption_level, sample_num):
     """
-    Corrupt a percentage of bytes in a chunk.
+    Random generator for one corruption sample.
+    
+    Philox keyed on the level, jumped ahead per sample, gives every sample its
+    own stream so they come out the same no matter which worker makes them.
+    """
+    return np.random.Generator(np.random.Philox(corruption_level).jumped(sample_num))
+
+
+def corrupt_chunk(chunk, corruption_percentage, rng):
+    """
+    Corrupt a percentage of bytes in a chunk, in place.
     
     Args:
-        chunk: bytes object to corrupt
+        chunk: writable uint8 numpy array to corrupt
         corruption_percentage: percentage of bytes to corrupt (0-100)
+        rng: numpy Generator to draw positions and values from
     
     Returns:
-        bytes: corrupted chunk
+        numpy array: the same chunk, for chaining
     """
     if corruption_percentage <= 0:
         return chunk
     
-    chunk_list = bytearray(chunk)
-    total_bytes = len(chunk_list)
-    bytes_to_corrupt = int(total_bytes * corruption_percentage / 100)
+    total_bytes = len(chunk)
+    bytes_to_corrupt = min(int(total_bytes * corruption_percentage / 100), total_bytes)
+    
+    if bytes_to_corrupt <= 0:
+        return chunk
+    
+    if corruption_percentage >= 25:
+        # Picking a big part of the chunk without replacement is slow, roll a random byte for
+        # every position and keep it where a 16 bit coin flip lands under the percentage
+        random_bytes = np.frombuffer(rng.bytes(total_bytes), dtype=np.uint8)
+        mask = np.frombuffer(rng.bytes(total_bytes * 2), dtype=np.uint16) < corruption_percentage * 65536 / 100
+        
+        # Branch free blend, chunk ^= (chunk ^ random) & 0xFF/0x00 per byte picks random where the mask is set.
+        # Plain bitwise ufuncs run as wide SIMD loops, a boolean np.where is several times slower.
+        byte_mask = mask.view(np.uint8)
+        np.negative(byte_mask, out=byte_mask)
+        flips = np.bitwise_xor(chunk, random_bytes)
+        np.bitwise_and(flips, byte_mask, out=flips)
+        np.bitwise_xor(chunk, flips, out=chunk)
+        return chunk
+    
+    # Randomly select positions to corrupt and replace them with random values.
+    # At the levels this path sees (k > n/50) choice runs a partial Fisher-Yates over
+    # a full arange(n), which ignores shuffle, so shuffle=False changes nothing here.
+    # It only skips the final shuffle of the set based sampler used for k <= n/50.
+    positions_to_corrupt = rng.choice(total_bytes, bytes_to_corrupt, replace=False, shuffle=False)
+    chunk[positions_to_corrupt] = rng.integers(0, 256, size=bytes_to_corrupt, dtype=np.uint8)
+    
+    return chunk
+
+
+class ProgressQueue:
+    """Stands in for a tqdm bar in a worker process, sends the updates back to the parent"""
+    
+    def __init__(self, queue):
+        self.queue = queue
+    
+    def update(self, n):
+        self.queue.put(n)
+
+
+# Set in every worker process by init_worker
+worker_progress = None
+worker_stop = None
+
+
+def init_worker(progress_queue, stop_event):
+    """Hook the worker up to the parent's byte progress bar and stop signal"""
+    global worker_progress, worker_stop
+    worker_progress = ProgressQueue(progress_queue)
+    worker_stop = stop_event
+
+
+def stop_samples(pool, futures, stop_event):
+    """
+    Stop a pool of sample jobs after Ctrl+C or an error, and clean up after them.
+    
+    Queued jobs are cancelled, and the few already handed to a worker see stop_event
+    and return without writing. Outputs of every sample that didn't finish are
+    deleted, so no half written or preallocated files are left looking like samples.
+    
+    futures: {future: output path}
+    """
+    stop_event.set()
+    pool.shutdown(wait=True, cancel_futures=True)
+    
+    for future, output_path in futures.items():
+        if future.cancelled() or future.exception() is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(output_path)
+
+
+@contextlib.contextmanager
+def byte_progress(total_bytes):
+    """
+    Overall bytes written progress bar that worker processes can report to.
     
-    if bytes_to_corrupt > 0:
-        # Randomly select positions to corrupt
-        positions_to_corrupt = random.sample(range(total_bytes), 
-                                           min(bytes_to_corrupt, total_bytes))
+    Yields the queue to hand to make_executor. A thread here in the parent moves
+    the updates onto the bar, until the queue gets None once the pool is shut down.
+    """
+    progress_queue = multiprocessing.Queue()
+    
+    with tqdm(total=total_bytes, desc="Bytes written", unit="B", unit_scale=True, position=1) as bytes_pbar:
+        def pump():
+            while (n := progress_queue.get()) is not None:
+                bytes_pbar.update(n)
         
-        # Replace selected bytes with random values
-        for pos in positions_to_corrupt:
-            chunk_list[pos] = random.randint(0, 255)
+        pump_thread = threading.Thread(target=pump, daemon=True)
+        pump_thread.start()
+        try:
+            yield progress_queue
+        finally:
+            progress_queue.put(None)
+            pump_thread.join()
+
+
+def make_executor(job_count, workers=None, progress_queue=None, stop_event=None):
+    """Process pool for creating samples at once (default: one worker per CPU)"""
+    workers = min(workers or os.cpu_count() or 1, max(job_count, 1))
+    if sys.platform == 'win32':
+        # ProcessPoolExecutor on Windows tops out at 61 workers
+        workers = min(workers, 61)
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(progress_queue, stop_event))
+
+
+def make_one_sample(input_file, output_path, corruption_level, sample_num, chunk_size=DEFAULT_CHUNK_SIZE,
+                    direct=False):
+    """
+    Create one corrupted sample, runs in a worker process.
     
-    return bytes(chunk_list)
+    Every worker maps the input itself, the kernel shares the page cache between them.
+    """
+    if worker_stop is not None and worker_stop.is_set():
+        return
+    
+    with open(input_file, 'rb') as infile, map_input(infile) as input_map:
+        stream_corrupt_file(input_map, output_path, corruption_level, 
+                          sample_rng(corruption_level, sample_num), worker_progress, chunk_size, direct)
+
 
+def make_one_download(input_file, output_path, completion_level, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Create one incomplete download, runs in a worker process. Returns the size written."""
+    if worker_stop is not None and worker_stop.is_set():
+        return 0
+    return stream_truncate_file(input_file, output_path, completion_level, worker_progress, chunk_size)
 
-def create_corruption_samples(input_file, output_dir, corruption_levels, samples_per_level=3):
+
+def create_corruption_samples(input_file, output_dir, corruption_levels, samples_per_level=3,
+                              chunk_size=DEFAULT_CHUNK_SIZE, workers=None, direct=False):
     """
     Create corrupted file samples with specified corruption levels using streaming.
     
@@ -133,6 +599,9 @@ def create_corruption_samples(input_file, output_dir, corruption_levels, samples
         output_dir: directory to save corrupted files
         corruption_levels: list of corruption percentages
         samples_per_level: number of samples to create per corruption level
+        chunk_size: size of chunks to stream at once
+        workers: number of samples to create at once (default: CPU count)
+        direct: write the samples around the OS page cache
     """
     input_path = Path(input_file)
     base_name = input_path.stem
@@ -141,33 +610,38 @@ def create_corruption_samples(input_file, output_dir, corruption_levels, samples
     
     print(f"Creating corruption samples for {input_file}")
     print(f"Original file size: {file_size:,} bytes ({file_size / (1024**3):.2f} GB)")
+    print(f"Creating {samples_per_level} samples for each of {', '.join(f'{level}%' for level in corruption_levels)} corruption...")
     
     # Calculate total operations for overall progress
     total_operations = len(corruption_levels) * samples_per_level
+    # Join the folder once, only the level and sample number change per file
+    output_prefix = os.path.join(output_dir, f"{base_name}-")
     
-    with tqdm(total=total_operations, desc="Overall Progress", unit="file", position=0) as overall_pbar:
+    # The pool is shut down (and the workers' updates flushed) before byte_progress stops listening
+    stop_event = multiprocessing.Event()
+    with byte_progress(file_size * total_operations) as progress_queue, \
+         make_executor(total_operations, workers, progress_queue, stop_event) as pool, \
+         tqdm(total=total_operations, desc="Overall Progress", unit="file", position=0) as overall_pbar:
+        futures = {}
         for corruption_level in corruption_levels:
-            print(f"\nCreating {samples_per_level} samples with {corruption_level}% corruption...")
-            
             for sample_num in range(1, samples_per_level + 1):
-                # Set seed for reproducible corruption patterns
-                random.seed(corruption_level * 1000 + sample_num)
-                
-                output_filename = f"{base_name}-{corruption_level}-{sample_num}{extension}"
-                output_path = os.path.join(output_dir, output_filename)
-                
-                # Create progress bar for current file
-                with tqdm(total=file_size, desc=f"Creating {output_filename}", 
-                         unit="B", unit_scale=True, position=1, leave=False) as file_pbar:
-                    
-                    stream_corrupt_file(input_file, output_path, corruption_level, 
-                                      file_size, file_pbar)
-                
-                print(f"  ✓ Created: {output_filename}")
+                output_path = f"{output_prefix}{corruption_level}-{sample_num}{extension}"
+                future = pool.submit(make_one_sample, input_file, output_path, corruption_level, 
+                                     sample_num, chunk_size, direct)
+                futures[future] = output_path
+        
+        try:
+            for future in as_completed(futures):
+                future.result()
+                print(f"  ✓ Created: {os.path.basename(futures[future])}")
                 overall_pbar.update(1)
+        except BaseException:
+            stop_samples(pool, futures, stop_event)
+            raise
 
 
-def create_incomplete_downloads(input_file, output_dir, completion_levels):
+def create_incomplete_downloads(input_file, output_dir, completion_levels, chunk_size=DEFAULT_CHUNK_SIZE,
+                                workers=None):
     """
     Create incomplete download samples with specified completion levels using streaming.
     
@@ -175,6 +649,8 @@ def create_incomplete_downloads(input_file, output_dir, completion_levels):
         input_file: path to input file
         output_dir: directory to save incomplete files
         completion_levels: list of completion percentages
+        chunk_size: size of chunks to stream at once
+        workers: number of samples to create at once (default: CPU count)
     """
     input_path = Path(input_file)
     base_name = input_path.stem
@@ -186,24 +662,31 @@ def create_incomplete_downloads(input_file, output_dir, completion_levels):
     
     # Calculate total operations for overall progress
     total_operations = len(completion_levels)
+    # Join the folder once, only the level changes per file
+    output_prefix = os.path.join(output_dir, f"{base_name}-incomplete-")
+    
+    total_bytes = sum(int(file_size * completion_level / 100) for completion_level in completion_levels)
     
-    with tqdm(total=total_operations, desc="Overall Progress", unit="file", position=0) as overall_pbar:
+    # The pool is shut down (and the workers' updates flushed) before byte_progress stops listening
+    stop_event = multiprocessing.Event()
+    with byte_progress(total_bytes) as progress_queue, \
+         make_executor(total_operations, workers, progress_queue, stop_event) as pool, \
+         tqdm(total=total_operations, desc="Overall Progress", unit="file", position=0) as overall_pbar:
+        futures = {}
         for completion_level in completion_levels:
-            output_filename = f"{base_name}-incomplete-{completion_level}{extension}"
-            output_path = os.path.join(output_dir, output_filename)
-            
-            expected_size = int(file_size * completion_level / 100)
-            
-            # Create progress bar for current file
-            with tqdm(total=expected_size, desc=f"Creating {output_filename}", 
-                     unit="B", unit_scale=True, position=1, leave=False) as file_pbar:
-                
-                stream_truncate_file(input_file, output_path, completion_level, 
-                                   file_size, file_pbar)
-            
-            actual_size = get_file_size(output_path)
-            print(f"  ✓ Created: {output_filename} ({actual_size:,} bytes, {completion_level}% complete)")
-            overall_pbar.update(1)
+            output_path = f"{output_prefix}{completion_level}{extension}"
+            future = pool.submit(make_one_download, input_file, output_path, completion_level, chunk_size)
+            futures[future] = (output_path, completion_level)
+        
+        try:
+            for future in as_completed(futures):
+                actual_size = future.result()
+                output_path, completion_level = futures[future]
+                print(f"  ✓ Created: {os.path.basename(output_path)} ({actual_size:,} bytes, {completion_level}% complete)")
+                overall_pbar.update(1)
+        except BaseException:
+            stop_samples(pool, {future: output_path for future, (output_path, _) in futures.items()}, stop_event)
+            raise
 
 
 def main():
@@ -215,8 +698,12 @@ def main():
                        help='Only create corruption samples, not incomplete downloads')
     parser.add_argument('--incomplete-only', action='store_true',
                        help='Only create incomplete download samples, not corruption samples')
-    parser.add_argument('--chunk-size', type=int, default=8192,
-                       help='Chunk size for streaming in bytes (default: 8192)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help=f'Chunk size for streaming in bytes (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('-w', '--workers', type=int,
+                       help='Number of samples to create at once (default: CPU count)')
+    parser.add_argument('--direct', action='store_true',
+                       help='Write corruption samples straight to disk, bypassing the OS file cache (Linux, macOS)')
     
     args = parser.parse_args()
     
@@ -237,6 +724,14 @@ def main():
         print("Error: samples-per-level must be at least 1")
         sys.exit(1)
     
+    if args.chunk_size < 1:
+        print("Error: chunk-size must be at least 1")
+        sys.exit(1)
+    
+    if args.workers is not None and args.workers < 1:
+        print("Error: workers must be at least 1")
+        sys.exit(1)
+    
     # Define corruption levels and samples
     corruption_levels = [10, 20, 35, 40, 50, 60, 75, 80, 90, 100]
     
@@ -250,11 +745,11 @@ def main():
         
         if not args.incomplete_only:
             create_corruption_samples(args.input_file, output_dir, 
-                                    corruption_levels, args.samples_per_level)
+                                    corruption_levels, args.samples_per_level, args.chunk_size, args.workers, args.direct)
         
         if not args.corruption_only:
             create_incomplete_downloads(args.input_file, output_dir, 
-                                      incomplete_levels)
+                                      incomplete_levels, args.chunk_size, args.workers)
         
         print("\n" + "=" * 60)
         print(f"✓ All test files created successfully in: {os.path.abspath(output_dir)}")